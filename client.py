@@ -5,7 +5,9 @@ to trigger the ASGI protocol violation.
 """
 
 import asyncio
+import json
 import logging
+import socket
 from typing import Any
 
 import httpx
@@ -17,15 +19,20 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# The Accept header must include BOTH application/json AND text/event-stream
+# for streamable_http to use SSE mode
+_SSE_HEADERS = {
+    "Accept": "application/json, text/event-stream",
+    "Content-Type": "application/json",
+}
 
-async def quick_disconnect_test() -> None:
-    """Connect and immediately disconnect before any events are sent."""
-    logger.info("=" * 60)
-    logger.info("TEST: Quick disconnect before first event")
-    logger.info("=" * 60)
+# Precomputed ms -> seconds for the delays main() exercises; any other delay
+# is converted only when it misses this table
+_DELAYS_S = {50: 0.05, 100: 0.1, 200: 0.2}
 
-    # Create a valid MCP initialize request
-    request_payload = {
+# A valid MCP initialize request, serialized once and sent as raw bytes
+_INIT_BYTES = json.dumps(
+    {
         "jsonrpc": "2.0",
         "id": 1,
         "method": "initialize",
@@ -38,84 +45,102 @@ async def quick_disconnect_test() -> None:
             },
         },
     }
+).encode()
+
+
+def build_client() -> httpx.AsyncClient:
+    """Build the AsyncClient shared by every test so connections are pooled.
+
+    client_fast_disconnect.py imports this too, so both TCP clients use the
+    same transport settings.
+    """
+    # JSON-RPC bodies are a few hundred bytes; disable Nagle so they are not
+    # held back waiting for more data. The server is plain HTTP on loopback,
+    # so skip loading a CA bundle and reading proxy settings from the env.
+    transport = httpx.AsyncHTTPTransport(
+        verify=False,
+        retries=0,
+        limits=httpx.Limits(
+            max_connections=32,
+            max_keepalive_connections=32,
+            keepalive_expiry=30,
+        ),
+        socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)],
+    )
+    return httpx.AsyncClient(
+        transport=transport,
+        trust_env=False,
+        timeout=httpx.Timeout(connect=1.0, read=30.0, write=1.0, pool=1.0),
+    )
+
+
+async def quick_disconnect_test(client: httpx.AsyncClient) -> None:
+    """Connect and immediately disconnect before any events are sent."""
+    # Per-test logger so output stays readable when tests run concurrently
+    logger = logging.getLogger(f"{__name__}.quick")
+    logger.info("=" * 60)
+    logger.info("TEST: Quick disconnect before first event")
+    logger.info("=" * 60)
 
-    async with httpx.AsyncClient() as client:
-        try:
-            # Send POST request to establish SSE connection
-            # The Accept header must include BOTH application/json AND text/event-stream
-            # for streamable_http to use SSE mode
-            logger.info("Sending POST request with SSE Accept header...")
-
-            async with client.stream(
-                "POST",
-                "http://localhost:8000/mcp",
-                json=request_payload,
-                headers={
-                    "Accept": "application/json, text/event-stream",
-                    "Content-Type": "application/json",
-                },
-                timeout=1.0,  # Short timeout to force quick disconnect
-            ) as response:
-                logger.info(f"Response status: {response.status_code}")
-                logger.info(f"Response headers: {dict(response.headers)}")
-
-                # Immediately close without reading any events
-                logger.info("Closing connection immediately without reading events...")
-                # Just exit the context manager to disconnect
-
-        except httpx.ReadTimeout:
-            logger.info("Timeout occurred (expected)")
-        except Exception as e:
-            logger.error(f"Error: {type(e).__name__}: {e}")
+    try:
+        # Send POST request to establish SSE connection
+        logger.info("Sending POST request with SSE Accept header...")
+
+        async with client.stream(
+            "POST",
+            "http://localhost:8000/mcp",
+            content=_INIT_BYTES,
+            headers=_SSE_HEADERS,
+            timeout=1.0,  # Short timeout to force quick disconnect
+        ) as response:
+            logger.info(f"Response status: {response.status_code}")
+            logger.info(f"Response headers: {dict(response.headers)}")
+
+            # Immediately close without reading any events
+            logger.info("Closing connection immediately without reading events...")
+            # Just exit the context manager to disconnect
+
+    except httpx.ReadTimeout:
+        logger.info("Timeout occurred (expected)")
+    except Exception as e:
+        logger.error(f"Error: {type(e).__name__}: {e}")
 
     logger.info("Connection closed")
     logger.info("")
 
 
-async def delayed_disconnect_test(delay_ms: int = 100) -> None:
+async def delayed_disconnect_test(
+    client: httpx.AsyncClient, delay_ms: int = 100
+) -> None:
     """Connect, wait briefly, then disconnect before events."""
+    logger = logging.getLogger(f"{__name__}.delayed_{delay_ms}ms")
     logger.info("=" * 60)
     logger.info(f"TEST: Delayed disconnect ({delay_ms}ms) before first event")
     logger.info("=" * 60)
 
-    request_payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "initialize",
-        "params": {
-            "protocolVersion": "2024-11-05",
-            "capabilities": {},
-            "clientInfo": {
-                "name": "test-client",
-                "version": "1.0.0",
-            },
-        },
-    }
-
-    async with httpx.AsyncClient() as client:
-        try:
-            logger.info("Sending POST request with SSE Accept header...")
-
-            async with client.stream(
-                "POST",
-                "http://localhost:8000/mcp",
-                json=request_payload,
-                headers={
-                    "Accept": "application/json, text/event-stream",
-                    "Content-Type": "application/json",
-                },
-                timeout=5.0,
-            ) as response:
-                logger.info(f"Response status: {response.status_code}")
-
-                # Wait a bit before disconnecting
-                await asyncio.sleep(delay_ms / 1000.0)
-                logger.info(f"Waited {delay_ms}ms, now closing without reading...")
-
-        except httpx.ReadTimeout:
-            logger.info("Timeout occurred")
-        except Exception as e:
-            logger.error(f"Error: {type(e).__name__}: {e}")
+    try:
+        logger.info("Sending POST request with SSE Accept header...")
+
+        async with client.stream(
+            "POST",
+            "http://localhost:8000/mcp",
+            content=_INIT_BYTES,
+            headers=_SSE_HEADERS,
+            timeout=5.0,
+        ) as response:
+            logger.info(f"Response status: {response.status_code}")
+
+            # Wait a bit before disconnecting
+            delay_s = _DELAYS_S.get(delay_ms)
+            if delay_s is None:
+                delay_s = delay_ms / 1000
+            await asyncio.sleep(delay_s)
+            logger.info(f"Waited {delay_ms}ms, now closing without reading...")
+
+    except httpx.ReadTimeout:
+        logger.info("Timeout occurred")
+    except Exception as e:
+        logger.error(f"Error: {type(e).__name__}: {e}")
 
     logger.info("Connection closed")
     logger.info("")
@@ -130,20 +155,18 @@ async def main() -> None:
     # Wait for user to confirm server is ready
     await asyncio.sleep(1)
 
-    # Test 1: Immediate disconnect
-    await quick_disconnect_test()
-    await asyncio.sleep(1)
-
-    # Test 2: Very quick disconnect (50ms)
-    await delayed_disconnect_test(50)
-    await asyncio.sleep(1)
-
-    # Test 3: Quick disconnect (100ms)
-    await delayed_disconnect_test(100)
-    await asyncio.sleep(1)
-
-    # Test 4: Slightly longer (200ms) - might still trigger the issue
-    await delayed_disconnect_test(200)
+    # The scenarios are independent, so run them concurrently
+    async with build_client() as client:
+        await asyncio.gather(
+            # Test 1: Immediate disconnect
+            quick_disconnect_test(client),
+            # Test 2: Very quick disconnect (50ms)
+            delayed_disconnect_test(client, 50),
+            # Test 3: Quick disconnect (100ms)
+            delayed_disconnect_test(client, 100),
+            # Test 4: Slightly longer (200ms) - might still trigger the issue
+            delayed_disconnect_test(client, 200),
+        )
 
     logger.info("=" * 60)
     logger.info("All tests completed")
@@ -152,4 +175,9 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not installed on Windows, cygwin or PyPy
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
@@ -5,10 +5,13 @@ disconnection before the server sends any events.
 """
 
 import asyncio
+import json
 import logging
 
 import httpx
 
+from client import _SSE_HEADERS, build_client
+
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(levelname)-8s %(name)s: %(message)s",
@@ -16,38 +19,56 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of burst attempts in flight at once
+_BURST_CONCURRENCY = 4
 
-async def ultra_fast_disconnect() -> None:
-    """Connect and force disconnect by cancelling the request task."""
-    logger.info("=" * 60)
-    logger.info("TEST: Ultra-fast disconnect via task cancellation")
-    logger.info("=" * 60)
-
-    request_payload = {
+# Request bodies are serialized once and sent as raw bytes
+_LIST_BYTES = json.dumps(
+    {
         "jsonrpc": "2.0",
         "id": 1,
         "method": "tools/list",  # Simple list request
         "params": {},
     }
+).encode()
+_SLOW_CALL_BYTES = json.dumps(
+    {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "tools/call",
+        "params": {
+            "name": "slow_operation",  # This takes 2 seconds
+            "arguments": {},
+        },
+    }
+).encode()
+
+
+async def ultra_fast_disconnect(client: httpx.AsyncClient) -> None:
+    """Connect and force disconnect by cancelling the request task."""
+    logger.info("=" * 60)
+    logger.info("TEST: Ultra-fast disconnect via task cancellation")
+    logger.info("=" * 60)
 
     async def make_request() -> None:
-        async with httpx.AsyncClient() as client:
-            logger.info("Starting SSE streaming request...")
-            async with client.stream(
-                "POST",
-                "http://localhost:8000/mcp",
-                json=request_payload,
-                headers={
-                    "Accept": "application/json, text/event-stream",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            ) as response:
-                logger.info(f"Got response: {response.status_code}")
-                logger.info("About to be cancelled...")
-                # This will be cancelled before we read anything
-                async for _ in response.aiter_bytes():
-                    pass
+        logger.info("Starting SSE streaming request...")
+        async with client.stream(
+            "POST",
+            "http://localhost:8000/mcp",
+            content=_LIST_BYTES,
+            headers=_SSE_HEADERS,
+            timeout=30.0,
+        ) as response:
+            logger.info(f"Got response: {response.status_code}")
+            logger.info("About to be cancelled...")
+            # Hold the stream open until cancelled, without reading anything.
+            # Waiting on an Event rather than iterating aiter_bytes() means
+            # __aexit__ never races an in-flight __anext__ on cancellation.
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                logger.debug("Cancelled while holding stream open")
+                raise
 
     task = asyncio.create_task(make_request())
 
@@ -67,46 +88,32 @@ async def ultra_fast_disconnect() -> None:
     logger.info("")
 
 
-async def rapid_disconnect_during_handshake() -> None:
+async def rapid_disconnect_during_handshake(client: httpx.AsyncClient) -> None:
     """Send request but disconnect during TCP/TLS handshake."""
     logger.info("=" * 60)
     logger.info("TEST: Disconnect during connection handshake")
     logger.info("=" * 60)
 
-    request_payload = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": "tools/call",
-        "params": {
-            "name": "slow_operation",  # This takes 2 seconds
-            "arguments": {},
-        },
-    }
-
-    async with httpx.AsyncClient() as client:
-        try:
-            # Use context manager but cancel immediately
-            logger.info("Opening streaming connection...")
-            request = client.build_request(
-                "POST",
-                "http://localhost:8000/mcp",
-                json=request_payload,
-                headers={
-                    "Accept": "application/json, text/event-stream",
-                    "Content-Type": "application/json",
-                },
-            )
-
-            # Send the request
-            response = await client.send(request, stream=True)
-            logger.info(f"Response started: {response.status_code}")
-
-            # Close immediately without reading
-            await response.aclose()
-            logger.info("Closed response immediately")
-
-        except Exception as e:
-            logger.error(f"Error: {type(e).__name__}: {e}")
+    try:
+        # Use context manager but cancel immediately
+        logger.info("Opening streaming connection...")
+        request = client.build_request(
+            "POST",
+            "http://localhost:8000/mcp",
+            content=_SLOW_CALL_BYTES,
+            headers=_SSE_HEADERS,
+        )
+
+        # Send the request
+        response = await client.send(request, stream=True)
+        logger.info(f"Response started: {response.status_code}")
+
+        # Close immediately without reading
+        await response.aclose()
+        logger.info("Closed response immediately")
+
+    except Exception as e:
+        logger.error(f"Error: {type(e).__name__}: {e}")
 
     logger.info("")
 
@@ -117,24 +124,35 @@ async def main() -> None:
     logger.info("Attempting to trigger ASGI protocol violation")
     logger.info("")
 
-    # Test 1: Ultra-fast disconnect via cancellation
-    await ultra_fast_disconnect()
-    await asyncio.sleep(1)
+    async with build_client() as client:
+        # Test 1: Ultra-fast disconnect via cancellation
+        await ultra_fast_disconnect(client)
+        await asyncio.sleep(1)
 
-    # Test 2: Rapid disconnect during handshake
-    await rapid_disconnect_during_handshake()
-    await asyncio.sleep(1)
+        # Test 2: Rapid disconnect during handshake
+        await rapid_disconnect_during_handshake(client)
+        await asyncio.sleep(1)
 
-    # Test 3: Multiple rapid attempts
-    logger.info("=" * 60)
-    logger.info("TEST: 10 rapid connection attempts")
-    logger.info("=" * 60)
+        # Test 3: Multiple rapid attempts sharing one connection pool
+        logger.info("=" * 60)
+        logger.info("TEST: 10 rapid connection attempts")
+        logger.info("=" * 60)
 
-    tasks = []
-    for i in range(10):
-        tasks.append(ultra_fast_disconnect())
+        # Bound how many attempts connect at once so they don't pile up in
+        # the server's accept queue before they can disconnect
+        sem = asyncio.Semaphore(_BURST_CONCURRENCY)
 
-    await asyncio.gather(*tasks, return_exceptions=True)
+        async def bounded_disconnect() -> None:
+            async with sem:
+                try:
+                    await ultra_fast_disconnect(client)
+                except Exception as e:
+                    # Keep one failed attempt from cancelling the rest
+                    logger.error(f"Error: {type(e).__name__}: {e}")
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(10):
+                tg.create_task(bounded_disconnect())
 
     logger.info("=" * 60)
     logger.info("All tests completed - check server logs for violations")
@@ -142,4 +160,9 @@ async def main() -> None:
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    try:
+        import uvloop
+    except ImportError:  # uvloop is not installed on Windows, cygwin or PyPy
+        asyncio.run(main())
+    else:
+        uvloop.run(main())